@@ -1,8 +1,11 @@
 #!/usr/bin/python3
 
+import concurrent.futures
+import contextlib
+import io
 import os
+import shutil
 import sys
-import io
 from hatchling.builders.hooks.plugin.interface import BuildHookInterface
 
 
@@ -21,19 +24,20 @@ class ManPageGenerator(BuildHookInterface):
             )
             return
 
-        # pypandoc spews install instructions to stderr when it can't find
-        # pandoc. So we redirect stderr and restore it with a saner
-        # message.
-        old_stderr = sys.stderr
-        pandoc_found = True
-        try:
-            with io.StringIO() as s:
-                sys.stderr = s
-                pypandoc.get_pandoc_version()
-        except OSError:
-            pandoc_found = False
-        finally:
-            sys.stderr = old_stderr
+        # pypandoc_binary ships its own pandoc, otherwise look it up in
+        # $PATH, neither needs to spawn pandoc. For anything else
+        # ($PYPANDOC_PANDOC, pypandoc's other search paths) ask pypandoc,
+        # which spews install instructions to stderr when it can't find
+        # pandoc, so we redirect stderr and print a saner message.
+        bundled = os.path.join(os.path.dirname(pypandoc.__file__), "files", "pandoc")
+        pandoc_found = os.path.exists(bundled) or shutil.which("pandoc") is not None
+        if not pandoc_found:
+            try:
+                with contextlib.redirect_stderr(io.StringIO()):
+                    pypandoc.get_pandoc_path()
+                pandoc_found = True
+            except OSError:
+                pass
 
         if not pandoc_found:
             print(
@@ -49,11 +53,14 @@ class ManPageGenerator(BuildHookInterface):
         mandir = os.path.join(here, "man")
         destdir = os.path.join(here, "dist", "man")
         os.makedirs(destdir, exist_ok=True)
-        for f in os.listdir(mandir):
-            if f.endswith(".md"):
-                path = os.path.join(mandir, f)
-                name = os.path.splitext(f)[0]
-                outfile = os.path.join(destdir, f"{name}.1")
-                pypandoc.convert_file(
-                    path, "man", outputfile=outfile, extra_args=["-s"]
-                )
+
+        def convert(f):
+            path = os.path.join(mandir, f)
+            name = os.path.splitext(f)[0]
+            outfile = os.path.join(destdir, f"{name}.1")
+            pypandoc.convert_file(path, "man", outputfile=outfile, extra_args=["-s"])
+
+        # each conversion spawns a pandoc process, run them in parallel
+        mdfiles = [f for f in os.listdir(mandir) if f.endswith(".md")]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+            list(ex.map(convert, mdfiles))
@@ -18,6 +18,10 @@
 #
 
 import click
+import concurrent.futures
+import fcntl
+import glob
+import io
 import select
 import sys
 import os
@@ -25,27 +29,30 @@ import os
 from hidtools.hidraw import HidrawDevice
 
 
+def _probe_device(path):
+    with open(path) as f:
+        return int(path[len("/dev/hidraw") :]), HidrawDevice.read_name(f)
+
+
 def list_devices():
     outfile = sys.stdout if os.isatty(sys.stdout.fileno()) else sys.stderr
-    devices = {}
-    for fname in os.listdir("/dev/"):
-        if not fname.startswith("hidraw"):
-            continue
+    paths = glob.glob("/dev/hidraw[0-9]*")
 
-        with open(f"/dev/{fname}") as f:
-            d = HidrawDevice(f)
-            devices[int(fname[6:])] = d.name
+    # each probe blocks on a few ioctls, run them in parallel
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        devices = dict(executor.map(_probe_device, paths))
 
     if not devices:
         print("No devices found", file=sys.stderr)
         sys.exit(1)
 
     print("Available devices:", file=outfile)
-    for num, name in sorted(devices.items()):
+    sorted_devices = sorted(devices.items())
+    for num, name in sorted_devices:
         print(f"/dev/hidraw{num}:	{name}", file=outfile)
 
-    lo = min(devices.keys())
-    hi = max(devices.keys())
+    lo = sorted_devices[0][0]
+    hi = sorted_devices[-1][0]
 
     print(
         f"Select the device event number [{lo}-{hi}]: ",
@@ -83,38 +90,56 @@ def main(device_list, output):
 
     devices = {}
     last_index = -1
-    poll = select.poll()
     is_first_event = True
 
     try:
         if not device_list:
             device_list = [open(list_devices())]
 
-        for idx, fd in enumerate(device_list):
-            device = HidrawDevice(fd)
-            if len(device_list) > 1:
-                print(f"D: {idx}", file=output)
-            device.dump(output)
-            poll.register(fd, select.POLLIN)
-            devices[fd.fileno()] = (idx, device)
-
-        if len(devices) == 1:
-            last_index = 0
-
-        while True:
-            events = poll.poll()
-            for fd, event in events:
-                idx, device = devices[fd]
-                device.read_events()
-                if last_index != idx:
-                    print(f"D: {idx}", file=output)
-                    last_index = idx
+        with select.epoll() as poll:
+            for idx, fd in enumerate(device_list):
+                fileno = fd.fileno()
+                device = HidrawDevice(fd)
+                prefix = f"D: {idx}\n"
+                if len(device_list) > 1:
+                    output.write(prefix)
                 device.dump(output)
-
-                if is_first_event:
-                    is_first_event = False
-                    for idx, d in devices.values():
-                        d.time_offset = device.time_offset
+                # non-blocking so we can drain all pending reports on
+                # each wakeup, see the BlockingIOError below
+                flags = fcntl.fcntl(fileno, fcntl.F_GETFL)
+                fcntl.fcntl(fileno, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+                poll.register(fileno, select.EPOLLIN)
+                devices[fileno] = (idx, device, prefix)
+
+            if len(devices) == 1:
+                last_index = 0
+
+            while True:
+                events = poll.poll()
+                # collect the dump of all ready devices and write it out
+                # in one go instead of one write per line
+                batch = io.StringIO()
+                for fd, event in events:
+                    idx, device, prefix = devices[fd]
+                    try:
+                        while True:
+                            nevents = len(device.events)
+                            device.read_events()
+                            if len(device.events) == nevents:
+                                break
+                    except BlockingIOError:
+                        pass
+                    if last_index != idx:
+                        batch.write(prefix)
+                        last_index = idx
+                    device.dump(batch)
+
+                    if is_first_event:
+                        is_first_event = False
+                        for idx, d, _ in devices.values():
+                            d.time_offset = device.time_offset
+                output.write(batch.getvalue())
+                output.flush()
 
     except PermissionError:
         print("Insufficient permissions, please run me as root.", file=sys.stderr)
@@ -125,7 +150,4 @@ def main(device_list, output):
 
 
 if __name__ == "__main__":
-    if sys.version_info < (3, 6):
-        sys.exit("Python 3.6 or later required")
-
     main()
@@ -1,5 +1,7 @@
 # SPDX-License-Identifier: GPL-2.0
+import functools
 import libevdev
+import sys
 
 from hidtools.device.base_device import BaseDevice
 from hidtools.util import BusType
@@ -18,7 +20,7 @@ class AxisMapping(object):
     and an evdev event"""
 
     def __init__(self, hid, evdev=None):
-        self.hid = hid.lower()
+        self.hid = sys.intern(hid.lower())
 
         if evdev is None:
             evdev = f"ABS_{hid.upper()}"
@@ -26,6 +28,52 @@ class AxisMapping(object):
         self.evdev = libevdev.evbit("EV_ABS", evdev)
 
 
+@functools.lru_cache(maxsize=64)
+def _application_fields(parsed_rdesc, application):
+    """
+    The usage names of all input fields of the given application
+    """
+    fields = []
+    for r in parsed_rdesc.input_reports.values():
+        if r.application_name == application:
+            fields.extend([f.usage_name for f in r])
+    return tuple(fields)
+
+
+@functools.lru_cache(maxsize=None)
+def _gamepad_data_class(attributes):
+    """
+    A :class:`GamepadData` equivalent restricted to the given attribute
+    names through ``__slots__``. Unset attributes are missing just like
+    on a plain object, so :meth:`hidtools.hid.HidReport.create_report`
+    handles both the same way.
+    """
+    return type("GamepadData", (object,), {"__slots__": attributes})
+
+
+@functools.lru_cache(maxsize=None)
+def _axis_attributes(cls):
+    """
+    The (x, y) attribute names of each entry of ``cls.axes_map``.
+    ``axes_map`` is a class attribute, so this is shared between all the
+    gamepads of the same class.
+    """
+    return {k: (v["x"].hid, v["y"].hid) for k, v in cls.axes_map.items()}
+
+
+def _merge_tuple(item, default):
+    """
+    Return the (x, y) tuple ``item`` where ``None`` values (or ``item``
+    being ``None`` altogether) are taken from ``default``.
+    """
+    if item is None:
+        return default
+    return (
+        default[0] if item[0] is None else item[0],
+        default[1] if item[1] is None else item[1],
+    )
+
+
 class BaseGamepad(BaseDevice):
     buttons_map = {
         1: "BTN_SOUTH",
@@ -59,23 +107,51 @@ class BaseGamepad(BaseDevice):
     def __init__(self, rdesc, application="Game Pad", name=None, input_info=None):
         assert rdesc is not None
         super().__init__(name, application, input_info=input_info, rdesc=rdesc)
+        self._axis_attrs = _axis_attributes(type(self))
         self.buttons = (1, 2, 3)
-        self._buttons = {}
+        # bit (idx - 1) is the state of button idx
+        self._buttons_mask = 0
         self.left = (127, 127)
         self.right = (127, 127)
         self.hat_switch = 15
+        # the state and the report of the last create_report() call
+        self._last_state = None
+        self._last_report = ()
         assert self.parsed_rdesc is not None
 
-        self.fields = []
-        for r in self.parsed_rdesc.input_reports.values():
-            if r.application_name == self.application:
-                self.fields.extend([f.usage_name for f in r])
+    @functools.cached_property
+    def fields(self):
+        """
+        The usage names of the input fields of this gamepad's application,
+        computed on first access
+        """
+        return list(_application_fields(self.parsed_rdesc, self.application))
+
+    @property
+    def buttons(self):
+        """
+        The indices of the buttons this gamepad supports
+        """
+        return self._supported_buttons
+
+    @buttons.setter
+    def buttons(self, buttons):
+        self._supported_buttons = tuple(buttons)
+        self._buttons_allowed = frozenset(self._supported_buttons)
+        self._button_attrs = {i: sys.intern(f"b{i}") for i in self._supported_buttons}
+
+        attributes = set(self._button_attrs.values())
+        for attrs in self._axis_attrs.values():
+            attributes.update(attrs)
+        attributes.add("hatswitch")
+        self._gamepad_data = _gamepad_data_class(tuple(sorted(attributes)))
+        # the last report was built for the previous buttons
+        self._last_state = None
 
     def store_axes(self, which, gamepad, data):
-        amap = self.axes_map[which]
-        x, y = data
-        setattr(gamepad, amap["x"].hid, x)
-        setattr(gamepad, amap["y"].hid, y)
+        ax, ay = self._axis_attrs[which]
+        setattr(gamepad, ax, data[0])
+        setattr(gamepad, ay, data[1])
 
     def create_report(
         self,
@@ -104,28 +180,19 @@ class BaseGamepad(BaseDevice):
         """
         if buttons is not None:
             for i, b in buttons.items():
-                if i not in self.buttons:
+                if i not in self._buttons_allowed:
                     raise InvalidHIDCommunication(
                         f"button {i} is not part of this {self.application}"
                     )
                 if b is not None:
-                    self._buttons[i] = b
-
-        def replace_none_in_tuple(item, default):
-            if item is None:
-                item = (None, None)
-
-            if None in item:
-                if item[0] is None:
-                    item = (default[0], item[1])
-                if item[1] is None:
-                    item = (item[0], default[1])
-
-            return item
+                    if b:
+                        self._buttons_mask |= 1 << (i - 1)
+                    else:
+                        self._buttons_mask &= ~(1 << (i - 1))
 
-        right = replace_none_in_tuple(right, self.right)
+        right = _merge_tuple(right, self.right)
         self.right = right
-        left = replace_none_in_tuple(left, self.left)
+        left = _merge_tuple(left, self.left)
         self.left = left
 
         if hat_switch is None:
@@ -135,16 +202,34 @@ class BaseGamepad(BaseDevice):
 
         reportID = reportID or self.default_reportID
 
-        gamepad = GamepadData()
-        for i, b in self._buttons.items():
-            gamepad.__setattr__(f"b{i}", int(b) if b is not None else 0)
+        # the report only depends on this state, if nothing changed since
+        # the last report there is no need to build it again
+        state = (
+            self._buttons_mask,
+            left,
+            right,
+            hat_switch,
+            reportID,
+            application,
+        )
+        if state == self._last_state:
+            return list(self._last_report)
+
+        gamepad = self._gamepad_data()
+        mask = self._buttons_mask
+        for i, attr in self._button_attrs.items():
+            setattr(gamepad, attr, (mask >> (i - 1)) & 1)
 
         self.store_axes("left_stick", gamepad, left)
         self.store_axes("right_stick", gamepad, right)
         gamepad.hatswitch = hat_switch  # type: ignore  ### gamepad is by default empty
-        return super().create_report(
+        report = super().create_report(
             gamepad, reportID=reportID, application=application
         )
+        # callers may modify the returned list, keep our own copy
+        self._last_state = state
+        self._last_report = tuple(report)
+        return report
 
     def event(
         self, *, left=(None, None), right=(None, None), hat_switch=None, buttons=None
@@ -161,11 +246,30 @@ class BaseGamepad(BaseDevice):
         :param buttons: a dict of index/bool for the button states,
             where ``None`` is "leave unchanged"
         """
-        r = self.create_report(
-            left=left, right=right, hat_switch=hat_switch, buttons=buttons
-        )
-        self.call_input_event(r)
-        return [r]
+        return self.events([(left, right, hat_switch, buttons)])
+
+    def events(self, batch):
+        """
+        Send a sequence of input events on the default report ID.
+
+        All the reports are built first and then injected in a row.
+
+        :param batch: a list of ``(left, right, hat_switch, buttons)``
+            tuples, each one taking the same values as the matching
+            arguments of :meth:`event`
+        :return: the list of reports sent
+        """
+        create_report = self.create_report
+        reports = [
+            create_report(
+                left=left, right=right, hat_switch=hat_switch, buttons=buttons
+            )
+            for left, right, hat_switch, buttons in batch
+        ]
+        # uhid takes exactly one event per write()
+        for r in reports:
+            self.call_input_event(r)
+        return reports
 
 
 class JoystickGamepad(BaseGamepad):
@@ -11,6 +11,9 @@ logging.basicConfig(format="%(levelname)s: %(name)s: %(message)s", level=logging
 base_logger = logging.getLogger("hidtools")
 logger = logging.getLogger("hidtools.device.sony_gamepad")
 
+# the layout of the rumble and of each LED in the PS3 output report
+_PS3_FIVE_BYTES = struct.Struct("< B B B B B")
+
 
 class InvalidHIDCommunication(Exception):
     pass
@@ -65,7 +68,7 @@ class PS3Rumble(object):
             self.right_motor_on,
             self.left_duration,
             self.left_motor_force,
-        ) = struct.unpack_from("< B B B B B", buf, self.offset)
+        ) = _PS3_FIVE_BYTES.unpack_from(buf, self.offset)
 
 
 class PS3LED(object):
@@ -87,7 +90,7 @@ class PS3LED(object):
             self.enabled,
             self.duty_off,
             self.duty_on,
-        ) = struct.unpack_from("< B B B B B", buf, self.offset)
+        ) = _PS3_FIVE_BYTES.unpack_from(buf, self.offset)
 
 
 class PS3LEDs(object):
@@ -97,7 +100,7 @@ class PS3LEDs(object):
         self.leds = [PS3LED(i) for i in range(4)]
 
     def parse(self, buf):
-        (self.leds_bitmap,) = struct.unpack_from("< B", buf, self.offset)
+        self.leds_bitmap = buf[self.offset]
         for led in self.leds:
             led.parse(buf)
 
@@ -138,7 +141,7 @@ class PS3Controller(JoystickGamepad):
     }
 
     # fmt: off
-    report_descriptor = [
+    report_descriptor = bytes([
         0x05, 0x01,                    # Usage Page (Generic Desktop)        0
         0x09, 0x04,                    # Usage (Joystick)                    2
         0xa1, 0x01,                    # Collection (Application)            4
@@ -214,7 +217,7 @@ class PS3Controller(JoystickGamepad):
         0xb1, 0x02,                    # ..Feature (Data,Var,Abs)            144
         0xc0,                          # .End Collection                     146
         0xc0,                          # End Collection                      147
-    ]
+    ])
     # fmt: on
 
     def __init__(self, rdesc=report_descriptor, name="Sony PLAYSTATION(R)3 Controller"):
@@ -277,7 +280,7 @@ class PS3Controller(JoystickGamepad):
             return 1
 
         # we have an output report to set the rumbles and LEDs
-        buf = struct.pack(f"< {len(data)}B", *data)
+        buf = bytes(data)
         self.rumble.parse(buf)
         self.hw_leds.parse(buf)
 
@@ -715,7 +718,7 @@ class PS4Controller(BaseGamepad):
 
 class PS4ControllerBluetooth(PS4Controller):
     # fmt: off
-    report_descriptor = [
+    report_descriptor = bytes([
         0x05, 0x01,                    # Usage Page (Generic Desktop)        0
         0x09, 0x05,                    # Usage (Game Pad)                    2
         0xa1, 0x01,                    # Collection (Application)            4
@@ -892,7 +895,7 @@ class PS4ControllerBluetooth(PS4Controller):
         0x09, 0x44,                    # .Usage (Vendor Usage 0x44)          359
         0xb1, 0x02,                    # .Feature (Data,Var,Abs)             361
         0xc0,                          # End Collection                      363
-    ]
+    ])
     # fmt: on
 
     def __init__(self, rdesc=report_descriptor, name="Wireless Controller"):
@@ -1019,7 +1022,7 @@ class PS4ControllerBluetooth(PS4Controller):
 
 class PS4ControllerUSB(PS4Controller):
     # fmt: off
-    report_descriptor = [
+    report_descriptor = bytes([
         0x05, 0x01,                    # Usage Page (Generic Desktop)        0
         0x09, 0x05,                    # Usage (Game Pad)                    2
         0xa1, 0x01,                    # Collection (Application)            4
@@ -1270,7 +1273,7 @@ class PS4ControllerUSB(PS4Controller):
         0x95, 0x3f,                    # .Report Count (63)                  502
         0xb1, 0x02,                    # .Feature (Data,Var,Abs)             504
         0xc0,                          # End Collection                      506
-    ]
+    ])
     # fmt: on
 
     def __init__(self, rdesc=report_descriptor):
@@ -1683,7 +1686,7 @@ class PS5Controller(BaseGamepad):
 
 class PS5ControllerBluetooth(PS5Controller):
     # fmt: off
-    report_descriptor = [
+    report_descriptor = bytes([
         0x05, 0x01,                    # Usage Page (Generic Desktop)        0
         0x09, 0x05,                    # Usage (Game Pad)                    2
         0xa1, 0x01,                    # Collection (Application)            4
@@ -1818,7 +1821,7 @@ class PS5ControllerBluetooth(PS5Controller):
         0x95, 0x3f,                    # .Report Count (63)                  274
         0xb1, 0x02,                    # .Feature (Data,Var,Abs)             276
         0xc0,                          # End Collection                      278
-    ]
+    ])
     # fmt: on
 
     def __init__(self, rdesc=report_descriptor):
@@ -1930,7 +1933,7 @@ class PS5ControllerBluetooth(PS5Controller):
 
 class PS5ControllerUSB(PS5Controller):
     # fmt: off
-    report_descriptor = [
+    report_descriptor = bytes([
         0x05, 0x01,                    # Usage Page (Generic Desktop)        0
         0x09, 0x05,                    # Usage (Game Pad)                    2
         0xa1, 0x01,                    # Collection (Application)            4
@@ -2057,7 +2060,7 @@ class PS5ControllerUSB(PS5Controller):
         0x95, 0x0f,                    # .Report Count (15)                  252
         0xb1, 0x02,                    # .Feature (Data,Var,Abs)             254
         0xc0,                          # End Collection                      256
-    ]
+    ])
     # fmt: on
 
     def __init__(self, rdesc=report_descriptor):
@@ -182,12 +182,12 @@ sensor_mods: Final = {
     0xF0: "Mod Vendor Reserved",
 }
 
-inv_hid: Dict[U16, str] = {}  # e.g 0b10000000 : "Input"
-hid_type: Dict[str, str] = {}  # e.g. "Input" : "Main"
-for type, items in hid_items.items():
-    for k, v in items.items():
-        inv_hid[v] = k
-        hid_type[k] = type
+# e.g 0b10000000 : "Input"
+inv_hid: Dict[U16, str] = {
+    v: k for items in hid_items.values() for k, v in items.items()
+}
+# e.g. "Input" : "Main"
+hid_type: Dict[str, str] = {k: t for t, items in hid_items.items() for k in items}
 
 
 class ParseError(Exception):
@@ -1098,14 +1098,16 @@ class HidField(object):
         return c
 
     def _usage_name(self: "HidField", usage: U32) -> str:
-        usage_page: U16 = usage >> 16
         value: U16 = usage & 0x0000FFFF
-        if usage_page in HUT:  # type: ignore ### Operator "in" not supported for types "int" and "HidUsageTable"
-            if HUT[usage_page].page_name == "Button":
+        # look up the page once in the {page_id: page} dict, then the usage
+        # in that page
+        usage_page = HUT.usage_pages.get(usage >> 16)
+        if usage_page is not None:
+            if usage_page.page_name == "Button":
                 name = f"B{str(value)}"
             else:
                 try:
-                    name = HUT[usage_page][value].name
+                    name = usage_page[value].name
                 except KeyError:
                     name = f"0x{usage:04x}"
         else:
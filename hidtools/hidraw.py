@@ -17,25 +17,31 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-import array
-import datetime
 import fcntl
+import functools
 import io
 import os
 import struct
 import sys
+import time
 from hidtools.hid import ReportDescriptor
 from hidtools.util import BusType
 
 from typing import Final
 
 
-def _ioctl(fd, EVIOC, code, return_type, buf=None):
-    size = struct.calcsize(return_type)
+@functools.lru_cache(maxsize=None)
+def _struct(format):
+    """the compiled :class:`struct.Struct` of the given format"""
+    return struct.Struct(format)
+
+
+def _ioctl(fd, request, return_type, buf=None):
+    s = _struct(return_type)
     if buf is None:
-        buf = size * "\x00"
-    abs = fcntl.ioctl(fd, EVIOC(code, size), buf)  # type: ignore
-    return struct.unpack(return_type, abs)
+        buf = bytes(s.size)
+    abs = fcntl.ioctl(fd, request, buf)  # type: ignore
+    return s.unpack(abs)
 
 
 # extracted from <asm-generic/ioctl.h>
@@ -82,10 +88,14 @@ def _IOC_HIDIOCGRDESCSIZE(none, len):
     return _IOR("H", 0x01, len)
 
 
+# the request numbers of the fixed size ioctls only need to be computed once
+_HIDIOCGRDESCSIZE_REQ: Final = _IOC_HIDIOCGRDESCSIZE(None, struct.calcsize("i"))
+
+
 def _HIDIOCGRDESCSIZE(fd):
     """get report descriptors size"""
     type = "i"
-    return int(*_ioctl(fd, _IOC_HIDIOCGRDESCSIZE, None, type))
+    return int(*_ioctl(fd, _HIDIOCGRDESCSIZE_REQ, type))
 
 
 # define HIDIOCGRDESC		_IOR('H', 0x02, struct hidraw_report_descriptor)
@@ -93,14 +103,17 @@ def _IOC_HIDIOCGRDESC(none, len):
     return _IOR("H", 0x02, len)
 
 
+# struct hidraw_report_descriptor { __u32 size; __u8 value[4096]; }
+_HIDIOCGRDESC_REQ: Final = _IOC_HIDIOCGRDESC(None, 4 + 4096)
+
+
 def _HIDIOCGRDESC(fd, size):
     """get report descriptors"""
-    format = "I4096c"
-    tmp = struct.pack("i", size) + bytes(4096)
-    _buffer = array.array("B", tmp)
-    fcntl.ioctl(fd, _IOC_HIDIOCGRDESC(None, struct.calcsize(format)), _buffer)
-    (size,) = struct.unpack("i", _buffer[:4])
-    value = _buffer[4 : size + 4]
+    _buffer = bytearray(4 + 4096)
+    struct.pack_into("i", _buffer, 0, size)
+    fcntl.ioctl(fd, _HIDIOCGRDESC_REQ, _buffer)
+    (size,) = struct.unpack_from("i", _buffer)
+    value = bytes(memoryview(_buffer)[4 : size + 4])
     return size, value
 
 
@@ -109,10 +122,13 @@ def _IOC_HIDIOCGRAWINFO(none, len):
     return _IOR("H", 0x03, len)
 
 
+_HIDIOCGRAWINFO_REQ: Final = _IOC_HIDIOCGRAWINFO(None, struct.calcsize("ihh"))
+
+
 def _HIDIOCGRAWINFO(fd):
     """get hidraw device infos"""
     type = "ihh"
-    return _ioctl(fd, _IOC_HIDIOCGRAWINFO, None, type)
+    return _ioctl(fd, _HIDIOCGRAWINFO_REQ, type)
 
 
 # define HIDIOCGRAWNAME(len)     _IOC(_IOC_READ, 'H', 0x04, len)
@@ -120,12 +136,16 @@ def _IOC_HIDIOCGRAWNAME(none, len):
     return _IOC(_IOC_READ, "H", 0x04, len)
 
 
+_HIDIOCGRAWNAME_REQ: Final = _IOC_HIDIOCGRAWNAME(None, 1024)
+
+
 def _HIDIOCGRAWNAME(fd):
     """get device name"""
-    type = 1024 * "c"
-    cstring = _ioctl(fd, _IOC_HIDIOCGRAWNAME, None, type)
-    string = b"".join(cstring).decode("utf-8")
-    return "".join(string).rstrip("\x00")
+    buf = bytearray(1024)
+    fcntl.ioctl(fd, _HIDIOCGRAWNAME_REQ, buf)
+    # the name is a NUL-terminated C string
+    nul = buf.find(0)
+    return buf[: nul if nul >= 0 else len(buf)].decode("utf-8")
 
 
 # define HIDIOCGFEATURE(len) _IOC(_IOC_WRITE|_IOC_READ, 'H', 0x07, len)
@@ -140,7 +160,7 @@ def _HIDIOCGFEATURE(fd, report_id, rsize):
     # rsize has the report length in it
     buf = bytearray([report_id & 0xFF]) + bytearray(rsize - 1)
     fcntl.ioctl(fd, _IOC_HIDIOCGFEATURE(None, len(buf)), buf)
-    return list(buf)  # Note: first byte is report ID
+    return buf  # Note: first byte is report ID
 
 
 # define HIDIOCSFEATURE(len) _IOC(_IOC_WRITE|_IOC_READ, 'H', 0x06, len)
@@ -171,9 +191,12 @@ class HidrawEvent(object):
 
     .. attribute:: bytes
 
-        The data bytes read for this event
+        The data bytes read for this event, as a :class:`bytes` object
     """
 
+    # captures can hold a lot of events, skip the per-instance __dict__
+    __slots__ = ("sec", "usec", "bytes")
+
     def __init__(self, sec, usec, bytes):
         self.sec, self.usec = sec, usec
         self.bytes = bytes
@@ -223,11 +246,13 @@ class HidrawDevice(object):
         This offset can be used to synchronize events from multiple devices,
         simply apply the offset of the first device to receive an event to
         all other devices to get synchronized time stamps for all devices.
+        The offset is a :func:`time.monotonic_ns` value.
     """
 
     def __init__(self, device):
         fd = device.fileno()
         self.device = device
+        self._fileno = fd
         self.name = _HIDIOCGRAWNAME(fd)
         bustype, self.vendor_id, self.product_id = _HIDIOCGRAWINFO(fd)
         self.bustype = BusType(bustype)
@@ -237,12 +262,31 @@ class HidrawDevice(object):
         rsize, desc = _HIDIOCGRDESC(fd, size)
         assert rsize == size
         assert len(desc) == rsize
-        self.report_descriptor = ReportDescriptor.from_bytes([x for x in desc])
+        self.report_descriptor = ReportDescriptor.from_bytes(desc)
 
         self.events = []
 
         self._dump_offset = -1
+        # {(report ID, size): (report, first row prefix, indentation)}
+        self._dump_cache = {}
         self.time_offset = None
+        # read_events() reads into this buffer and only copies the actual
+        # report out of it
+        self._read_buffer = memoryview(bytearray(4096))
+
+    @classmethod
+    def read_name(cls, device):
+        """
+        Fetch only the name of a hidraw device, without reading and parsing
+        its report descriptor. ::
+
+            with open('/dev/hidraw0') as fd:
+                print(HidrawDevice.read_name(fd))
+
+        :param File device: a file-like object pointing to ``/dev/hidrawX``
+        :return: the device name
+        """
+        return _HIDIOCGRAWNAME(device.fileno())
 
     def __repr__(self):
         return f"{self.name} bus: {self.bustype:02x} vendor: {self.vendor_id:04x} product: {self.product_id:04x}"
@@ -251,7 +295,7 @@ class HidrawDevice(object):
         """
         Read events from the device and append them to :attr:`events`.
 
-        This function simply calls :func:`os.read`, it is the caller's task to
+        This function simply calls :func:`os.readv`, it is the caller's task to
         either make sure the device is set nonblocking or to handle any
         :class:`KeyboardInterrupt` if this call does end up blocking.
 
@@ -259,22 +303,24 @@ class HidrawDevice(object):
         """
 
         index = max(0, len(self.events) - 1)
+        fd = self._fileno
+        buf = self._read_buffer
 
         loop = True
         while loop:
-            data = os.read(self.device.fileno(), 4096)
-            if not data:
+            n = os.readv(fd, [buf])
+            if not n:
                 break
-            if len(data) < 4096:
+            if n < 4096:
                 loop = False
+            data = bytes(buf[:n])
 
-            now = datetime.datetime.now()
+            now = time.monotonic_ns()
             if self.time_offset is None:
                 self.time_offset = now
-            tdelta = now - self.time_offset
-            bytes = struct.unpack("B" * len(data), data)
+            sec, usec = divmod((now - self.time_offset) // 1000, 1000000)
 
-            self.events.append(HidrawEvent(tdelta.seconds, tdelta.microseconds, bytes))
+            self.events.append(HidrawEvent(sec, usec, data))
 
         count = len(self.events) - index
 
@@ -282,16 +328,22 @@ class HidrawDevice(object):
 
     def _dump_event(self, event, file):
         report_id = event.bytes[0]
+        size = len(event.bytes)
+
+        try:
+            rdesc, prefix, indent = self._dump_cache[(report_id, size)]
+        except KeyError:
+            rdesc = self.report_descriptor.get(report_id, size)
+            prefix, indent = None, None
+            self._dump_cache[(report_id, size)] = (rdesc, prefix, indent)
 
-        rdesc = self.report_descriptor.get(report_id, len(event.bytes))
         if rdesc is not None:
-            indent_2nd_line = 2
             output = rdesc.format_report(event.bytes)
-            try:
+            # the indentation only depends on the first row up to the first
+            # '/', no need to look for it again if that didn't change
+            if prefix is None or not output.startswith(prefix):
+                indent_2nd_line = 2
                 first_row = output.split("\n")[0]
-            except IndexError:
-                pass
-            else:
                 # we have a multi-line output, find where the fields are split
                 try:
                     slash = first_row.index("/")
@@ -300,16 +352,41 @@ class HidrawDevice(object):
                 else:
                     # the `+1` below is to make a better visual effect
                     indent_2nd_line = slash + 1
-            indent = f'\n#{" " * indent_2nd_line}'
-            output = indent.join(output.split("\n"))
+                    prefix = first_row[: slash + 1]
+                indent = f'\n#{" " * indent_2nd_line}'
+                self._dump_cache[(report_id, size)] = (rdesc, prefix, indent)
+            output = output.replace("\n", indent)
             print(f"# {output}", file=file)
 
-        data = map(lambda x: f"{x:02x}", event.bytes)
+        data = bytes(event.bytes).hex(" ")
+        print(
+            f"E: {event.sec:06d}.{event.usec:06d} {len(event.bytes)} {data}", file=file
+        )
+
+    @functools.cached_property
+    def _dump_header(self):
+        """
+        The device description printed by :meth:`dump`, it does not
+        change so it is only formatted once.
+        """
+        out = io.StringIO()
+        print(f"# {self.name}", file=out)
+        output = io.StringIO()
+        self.report_descriptor.dump(output)
+        for line in output.getvalue().split("\n"):
+            print(f"# {line}", file=out)
+        output.close()
+
+        rdesc = bytes(self.report_descriptor.bytes)
+        rd = rdesc.hex(" ")
+        sz = len(rdesc)
+        print(f"R: {sz} {rd}", file=out)
+        print(f"N: {self.name}", file=out)
         print(
-            f'E: {event.sec:06d}.{event.usec:06d} {len(event.bytes)} {" ".join(data)}',
-            file=file,
-            flush=True,
+            f"I: {self.bustype:x} {self.vendor_id:04x} {self.product_id:04x}",
+            file=out,
         )
+        return out.getvalue()
 
     def dump(self, file=sys.stdout, from_the_beginning=False):
         """
@@ -334,29 +411,21 @@ class HidrawDevice(object):
         if from_the_beginning:
             self._dump_offset = -1
 
+        # everything is formatted in memory first and written out at once
+        out = io.StringIO()
+
         if self._dump_offset == -1:
-            print(f"# {self.name}", file=file)
-            output = io.StringIO()
-            self.report_descriptor.dump(output)
-            for line in output.getvalue().split("\n"):
-                print(f"# {line}", file=file)
-            output.close()
-
-            rd = " ".join([f"{b:02x}" for b in self.report_descriptor.bytes])
-            sz = len(self.report_descriptor.bytes)
-            print(f"R: {sz} {rd}", file=file)
-            print(f"N: {self.name}", file=file)
-            print(
-                f"I: {self.bustype:x} {self.vendor_id:04x} {self.product_id:04x}",
-                file=file,
-                flush=True,
-            )
+            out.write(self._dump_header)
             self._dump_offset = 0
 
         for e in self.events[self._dump_offset :]:
-            self._dump_event(e, file)
+            self._dump_event(e, out)
         self._dump_offset = len(self.events)
 
+        if out.tell():
+            file.write(out.getvalue())
+            file.flush()
+
     def get_feature_report(self, report_ID):
         """
         Fetch the Feature Report with the given report ID
@@ -364,11 +433,10 @@ class HidrawDevice(object):
         Note that the returned array contains the report ID as the first
         byte, but only if the report is a numbered report.
 
-        :return: an array of bytes with the Feature Report data.
+        :return: a :class:`bytearray` with the Feature Report data.
         """
         report = self.report_descriptor.feature_reports[report_ID]
-        fd = self.device.fileno()
-        return _HIDIOCGFEATURE(fd, report_ID, report.size)
+        return _HIDIOCGFEATURE(self._fileno, report_ID, report.size)
 
     def set_feature_report(self, report_ID, data):
         """
@@ -380,7 +448,6 @@ class HidrawDevice(object):
         # throw an exception for invalid ids
         self.report_descriptor.feature_reports[report_ID]
         assert data[0] == report_ID
-        fd = self.device.fileno()
-        sz = _HIDIOCSFEATURE(fd, data)
+        sz = _HIDIOCSFEATURE(self._fileno, data)
         if sz != len(data):
             raise OSError("Failed to write data: {data} - bytes written: {sz}")
@@ -19,20 +19,22 @@
 #
 
 import os
-from re import Match
-import parse
 import functools
+import json
 import sys
 
+from hidtools._version import __version__
 from collections import abc
 from typing import (
     Annotated,
     Any,
+    Callable,
     Dict,
     Hashable,
     Iterator,
     NamedTuple,
     Optional,
+    Tuple,
     Type,
     Union,
     cast,
@@ -46,6 +48,11 @@ else:
 DATA_DIRNAME = "data"
 SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 DATA_DIR = os.path.join(SCRIPT_DIR, DATA_DIRNAME)
+CACHE_FILE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "hid-tools",
+    "hut.json",
+)
 
 
 class ValueRange(NamedTuple):
@@ -98,7 +105,8 @@ class HidUsage(Hashable):
     ) -> None:
         self.usage_page = usage_page
         self.usage = usage
-        self.name = name
+        # many names are shared across pages, e.g. "Undefined"
+        self.name = sys.intern(name)
 
     # Route everything down to the name, this way we basically behave like a
     # string
@@ -164,11 +172,47 @@ class HidUsagePage(object):
         The assigned name for this usage Page, e.g. "Generic Desktop"
     """
 
+    __slots__ = ("_page_id", "_name", "_usages", "_usages_loader", "_inverted")
+
     def __init__(self: "HidUsagePage") -> None:
         self._usages: Dict[U16, HidUsage] = {}
+        self._inverted: Dict[str, HidUsage] = {}
+
+    def _set_usages_loader(
+        self: "HidUsagePage", loader: Callable[["HidUsagePage"], None]
+    ) -> None:
+        """
+        Defer filling this page until its usages are first needed.
+        ``loader`` is then called once with this (empty) page and must
+        fill it.
+        """
+        del self._usages
+        del self._inverted
+        self._usages_loader = loader
+
+    def __getattr__(self: "HidUsagePage", attr: str) -> Any:
+        # only called when a slot is unset, i.e. for _usages and
+        # _inverted until the page is loaded
+        if attr not in ("_usages", "_inverted"):
+            raise AttributeError(attr)
+        loader = self._usages_loader
+        self._usages = {}
+        self._inverted = {}
+        try:
+            loader(self)
+        except BaseException:
+            # leave the page unloaded so the next access tries again
+            del self._usages
+            del self._inverted
+            raise
+        del self._usages_loader
+        # loaders may fill _usages directly
+        self._inverted = {v.name: v for v in self._usages.values()}
+        return self._usages if attr == "_usages" else self._inverted
 
     def __setitem__(self: "HidUsagePage", key: U16, value: HidUsage) -> None:
         self._usages[key] = value
+        self._inverted[value.name] = value
 
     def __getitem__(self: "HidUsagePage", key: Union[str, U16, U32]) -> HidUsage:
         if isinstance(key, str):
@@ -181,7 +225,9 @@ class HidUsagePage(object):
         return self._usages[key]
 
     def __delitem__(self: "HidUsagePage", key: U16) -> None:
-        del self._usages[key]
+        usage = self._usages.pop(key)
+        if self._inverted.get(usage.name) is usage:
+            del self._inverted[usage.name]
 
     def __iter__(self: "HidUsagePage") -> Iterator[U16]:
         return iter(self._usages)
@@ -221,7 +267,7 @@ class HidUsagePage(object):
 
     @page_name.setter
     def page_name(self: "HidUsagePage", name: str) -> None:
-        self._name = name
+        self._name = sys.intern(name)
 
     @property
     def from_name(self: "HidUsagePage") -> Dict[str, HidUsage]:
@@ -229,13 +275,7 @@ class HidUsagePage(object):
         A dictionary using ``{ name: usage }`` mapping, to look up the
         :class:`HidUsage` based on a name.
         """
-        try:
-            return self._inverted
-        except AttributeError:
-            self._inverted: Dict[str, HidUsage] = {}
-            for _, v in self.items():
-                self._inverted[v.name] = v
-            return self._inverted
+        return self._inverted
 
     @property
     def from_usage(self: "HidUsagePage") -> Dict[U16, HidUsage]:
@@ -275,9 +315,12 @@ class HidUsageTable(object):
 
     def __init__(self: "HidUsageTable") -> None:
         self._pages: Dict[U16, HidUsagePage] = {}
+        # built on demand by usage_page_names
+        self._page_names: Optional[Dict[str, HidUsagePage]] = None
 
     def __setitem__(self: "HidUsageTable", key: U16, value: HidUsagePage) -> None:
         self._pages[key] = value
+        self._page_names = None
 
     def __getitem__(self: "HidUsageTable", key: Union[str, U16]) -> HidUsagePage:
         if isinstance(key, str):
@@ -290,6 +333,7 @@ class HidUsageTable(object):
 
     def __delitem__(self: "HidUsageTable", key) -> None:
         del self._pages[key]
+        self._page_names = None
 
     def __iter__(self: "HidUsageTable") -> Iterator[HidUsagePage]:
         return iter(self._pages)
@@ -325,7 +369,9 @@ class HidUsageTable(object):
             HUT.usage_page_names['Generic Desktop']
 
         """
-        return {v.page_name: v for _, v in self.items()}
+        if self._page_names is None:
+            self._page_names = {v.page_name: v for v in self._pages.values()}
+        return self._page_names
 
     def usage_page_from_name(
         self: "HidUsageTable", page_name: str
@@ -341,10 +387,7 @@ class HidUsageTable(object):
 
         :return: the :meth:`HidUsagePage` or None
         """
-        try:
-            return self[page_name]
-        except KeyError:
-            return None
+        return self.usage_page_names.get(page_name)
 
     def usage_page_from_page_id(
         self: "HidUsageTable", page_id: U16
@@ -387,39 +430,37 @@ class HidUsageTable(object):
             if not line or line.startswith("#"):
                 continue
 
-            r: Match[str]
+            number, _, name = line.partition("\t")
+            assert name
 
             # Usage Page, e.g. '(01)	Generic Desktop'
-            if line.startswith("("):
+            if number.startswith("("):
                 assert usage_page is None
+                assert number.endswith(")")
 
-                r = parse.parse("({idx:x})\t{page_name}", line)  # type: ignore
-                assert r is not None
                 usage_page = HidUsagePage()
-                usage_page.page_id = r["idx"]  # type: ignore
-                usage_page.page_name = r["page_name"]
+                usage_page.page_id = int(number[1:-1], 16)
+                usage_page.page_name = name
                 continue
 
             assert usage_page is not None
 
+            # the HUT files only spell it "Reserved" or "reserved", no need
+            # for a lowercase copy of every name
+            reserved = "Reserved" in name or "reserved" in name
+
             # Reserved ranges, e.g  '0B-1F	Reserved'
-            r = parse.parse("{:x}-{:x}\t{name}", line)  # type: ignore
-            if r:
-                if "reserved" not in r["name"].lower():
+            if "-" in number:
+                if not reserved:
                     print(line)
                 continue
 
             # Single usage, e.g. 36	Slider
-            # we can not use {usage:x} or the value '0B' will be converted to 0
-            # See https://github.com/r1chardj0n3s/parse/issues/65
-            # fixed in parse 1.8.4 (May 2018)
-            r = parse.parse("{usage}\t{name}", line)  # type: ignore
-            assert r is not None
-            if "reserved" in r["name"].lower():
+            if reserved:
                 continue
 
-            u = int(r["usage"], 16)
-            usage = HidUsage(usage_page, u, r["name"])
+            u = int(number, 16)
+            usage = HidUsage(usage_page, u, name)
 
             usage_page[u] = usage
 
@@ -444,21 +485,143 @@ class HidUsageTable(object):
             > print(usages[0x01].page_id)
             1
 
+        The parsed tables are cached in :data:`CACHE_FILE`, the text files
+        are only parsed again when they change.
+
         :return: a :class:`hidtools.HidUsageTable` object
         """
+        key = cls._hut_data_key()
+        hut = cls._from_cache(key)
+        if hut is not None:
+            return hut
+
         hut = HidUsageTable()
-        for filename in os.listdir(DATA_DIR):
-            if filename.endswith(".hut"):
-                with open(os.path.join(DATA_DIR, filename), "r", encoding="utf-8") as f:
+        with os.scandir(DATA_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith(".hut"):
                     try:
-                        usage_page = cls._parse_usages(f)
+                        usage_page = cls._page_from_file(entry.path)
                         hut[usage_page.page_id] = usage_page
                     except:
-                        print(filename)
+                        print(entry.name)
                         raise
 
+        hut._to_cache(key)
+
         return hut
 
+    @classmethod
+    def _page_from_file(cls: Type["HidUsageTable"], path: str) -> HidUsagePage:
+        """
+        Return the :class:`HidUsagePage` of the given HUT file. Only the
+        Usage Page line is read here, the usages are parsed on first use
+        of the page.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    break
+        number, _, name = line.partition("\t")
+        assert number.startswith("(") and number.endswith(")") and name
+
+        usage_page = HidUsagePage()
+        usage_page.page_id = int(number[1:-1], 16)
+        usage_page.page_name = name
+
+        def load(usage_page: HidUsagePage) -> None:
+            # decode the whole file at once instead of line by line
+            with open(path, "rb") as f:
+                data = f.read().decode("utf-8")
+            parsed = cls._parse_usages(data.split("\n"))
+            assert parsed.page_id == usage_page.page_id
+            for u, usage in parsed.items():
+                usage.usage_page = usage_page
+                usage_page[u] = usage
+
+        usage_page._set_usages_loader(load)
+        return usage_page
+
+    @classmethod
+    def _hut_data_key(cls: Type["HidUsageTable"]) -> Tuple[Any, ...]:
+        """
+        A key identifying the current set of HUT files, any change to those
+        files invalidates the cache.
+        """
+        with os.scandir(DATA_DIR) as entries:
+            files = sorted(
+                (e.name, e.stat()) for e in entries if e.name.endswith(".hut")
+            )
+        return (__version__, *((n, st.st_mtime_ns, st.st_size) for n, st in files))
+
+    @classmethod
+    def _from_cache(
+        cls: Type["HidUsageTable"], key: Tuple[Any, ...]
+    ) -> Optional["HidUsageTable"]:
+        """
+        Load the HID Usage Tables from :data:`CACHE_FILE`.
+
+        :return: a :class:`hidtools.HidUsageTable` object or ``None`` if the
+            cache is missing, unreadable or outdated
+        """
+        try:
+            with open(CACHE_FILE, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            # JSON has no tuples, compare against the key as it was stored
+            if cached["key"] != json.loads(json.dumps(key)):
+                return None
+
+            hut = HidUsageTable()
+            for page_id, (page_name, usages) in cached["pages"].items():
+                usage_page = HidUsagePage()
+                usage_page.page_id = int(page_id)
+                usage_page.page_name = str(page_name)
+                usage_page._set_usages_loader(
+                    functools.partial(
+                        cls._load_cached_usages,
+                        {int(u): str(name) for u, name in usages.items()},
+                    )
+                )
+                hut[usage_page.page_id] = usage_page
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return None
+        return hut
+
+    @staticmethod
+    def _load_cached_usages(usages: Dict[U16, str], usage_page: HidUsagePage) -> None:
+        """
+        Fill ``usage_page`` from the cached ``{usage: name}`` dictionary
+        """
+        usage_page._usages.update(
+            {u: HidUsage(usage_page, u, name) for u, name in usages.items()}
+        )
+
+    def _to_cache(self: "HidUsageTable", key: Tuple[Any, ...]) -> None:
+        """
+        Store the HID Usage Tables in :data:`CACHE_FILE`. We only store
+        the plain ``{page_id: [page_name, {usage: name}]}`` data as JSON,
+        so loading the cache never runs any code. Failing to write the
+        cache is not an error.
+
+        This loads all the pages, so it is only done once the cache file
+        could be opened.
+        """
+        try:
+            os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+            tmpfile = f"{CACHE_FILE}.{os.getpid()}"
+            with open(tmpfile, "w", encoding="utf-8") as f:
+                pages = {
+                    page_id: [
+                        page.page_name,
+                        {u: usage.name for u, usage in page.items()},
+                    ]
+                    for page_id, page in self.items()
+                }
+                json.dump({"key": key, "pages": pages}, f)
+            os.replace(tmpfile, CACHE_FILE)
+        except OSError:
+            pass
+
 
 HUT = HidUsageTable._from_hut_data()
 """
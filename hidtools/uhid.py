@@ -18,12 +18,13 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import functools
 import hidtools.hid
 from hidtools.util import BusType
 import os
 import select
+import socket
 import struct
-import time
 import uuid
 
 from hidtools.hut import U8, U32
@@ -42,12 +43,64 @@ from typing import (
 
 from pathlib import Path
 
-from pyroute2 import UeventSocket
-
 import logging
 
 logger = logging.getLogger("hidtools.hid.uhid")
 
+# from <linux/netlink.h>, not exported by the socket module
+_NETLINK_KOBJECT_UEVENT: Final = 15
+
+# the layouts of the struct uhid_event messages we send and receive, see
+# <linux/uhid.h>
+_EVENT_TYPE: Final = struct.Struct("< L")
+_START: Final = struct.Struct("< L Q")
+# the data of output and set_report events is not unpacked but sliced
+# to its actual size, see _uhid_output() and _uhid_set_report()
+_OUTPUT: Final = struct.Struct("< 4x 4096x H B")
+_GET_REPORT: Final = struct.Struct("< L L B B")
+# UHID_DATA_MAX bytes of data follow the input2 and get_report_reply
+# headers, see _pack_data()
+_DATA_MAX: Final = 4096
+_GET_REPORT_REPLY: Final = struct.Struct("< L L H H")
+_CREATE2: Final = struct.Struct("< L 128s 64s 64s H H L L L L 4096s")
+# offset of rd_data in struct uhid_create2_req
+_CREATE2_RD_DATA: Final = _CREATE2.size - 4096
+_INPUT2: Final = struct.Struct("< L H")
+_SET_REPORT: Final = struct.Struct("< L L B B H")
+_SET_REPORT_REPLY: Final = struct.Struct("< L L H")
+
+
+def _pack_data(
+    buf: bytearray, offset: int, data: Union[bytes, bytearray], end: int
+) -> int:
+    """
+    Copy ``data`` at ``offset`` in ``buf``, a message that is reused and
+    whose previous data ended at ``end``. Only the leftovers of a longer
+    previous data are cleared, so the rest of the data field stays zeroed
+    without rewriting it all.
+
+    :return: the new end of the data
+    """
+    data = data[:_DATA_MAX]
+    new_end = offset + len(data)
+    buf[offset:new_end] = data
+    if new_end < end:
+        buf[new_end:end] = bytes(end - new_end)
+    return new_end
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_rdesc(rdesc: Union[str, bytes]) -> hidtools.hid.ReportDescriptor:
+    """
+    Parse the given report descriptor, either the bytes or the string of
+    hex numbers. Devices of the same class share their report descriptor,
+    so only parse it once and share the :class:`ReportDescriptor`, it is
+    not modified after parsing.
+    """
+    if isinstance(rdesc, str):
+        return hidtools.hid.ReportDescriptor.from_string(f"XXX {rdesc}")
+    return hidtools.hid.ReportDescriptor.from_bytes(rdesc)
+
 
 class UHIDIncompleteException(Exception):
     """
@@ -93,7 +146,8 @@ class UHIDDevice(object):
     UHID_OUTPUT_REPORT: Final = 1
     UHID_INPUT_REPORT: Final = 2
 
-    _polling_functions: Dict[int, Callable[[], None]] = {}
+    # indexed by fd, fds are small integers
+    _polling_functions: List[Optional[Callable[[], None]]] = []
     _poll = select.poll()
     _devices: List["UHIDDevice"] = []
 
@@ -115,6 +169,7 @@ class UHIDDevice(object):
             for fd, mask in devices:
                 if mask & select.POLLIN:
                     fun = cls._polling_functions[fd]
+                    assert fun is not None
                     fun()
             devices = cls._poll.poll(timeout)
             had_data = True
@@ -128,11 +183,15 @@ class UHIDDevice(object):
         mask=select.POLLIN,
     ) -> None:
         cls._poll.register(fd, mask)
-        cls._polling_functions[fd] = read_function
+        functions = cls._polling_functions
+        if len(functions) <= fd:
+            functions.extend([None] * (fd + 1 - len(functions)))
+        functions[fd] = read_function
 
     @classmethod
     def _remove_fd_from_poll(cls: Type["UHIDDevice"], fd: int) -> None:
         cls._poll.unregister(fd)
+        cls._polling_functions[fd] = None
 
     def __init__(self: "UHIDDevice") -> None:
         self._name: Optional[str] = None
@@ -141,18 +200,20 @@ class UHIDDevice(object):
         self.parsed_rdesc: Optional[hidtools.hid.ReportDescriptor] = None
         self._info: Optional[Tuple[int, int, int]] = None
         self._bustype: Optional[BusType] = None
-        self._fd: int = os.open("/dev/uhid", os.O_RDWR)
-        self._start = self.start
-        self._stop = self.stop
-        self._open = self.open
-        self._close = self.close
-        self._output_report = self.output_report
+        self._fd: int = os.open("/dev/uhid", os.O_RDWR | os.O_NONBLOCK)
+        # the messages sent on every input event or GetReport are packed
+        # into those instead of allocating a new buffer each time
+        self._input_buf = bytearray(_INPUT2.size + _DATA_MAX)
+        self._input_end = _INPUT2.size
+        self._get_report_buf = bytearray(_GET_REPORT_REPLY.size + _DATA_MAX)
+        self._get_report_end = _GET_REPORT_REPLY.size
         self._ready: bool = False
         self._is_destroyed: bool = False
         self._sys_path: Optional[Path] = None
+        self._hidraw_sysfs: Tuple[Path, ...] = ()
         self.uniq = f"uhid_{str(uuid.uuid4())}"
         self.hid_id: int = 0
-        self._append_fd_to_poll(self._fd, self._process_one_event)
+        self._append_fd_to_poll(self._fd, self._process_events)
         UHIDDevice._devices.append(self)
 
     def __enter__(self: "UHIDDevice") -> "UHIDDevice":
@@ -183,11 +244,9 @@ class UHIDDevice(object):
         if isinstance(rdesc, hidtools.hid.ReportDescriptor):
             self.parsed_rdesc = rdesc
         else:
-            if isinstance(rdesc, str):
-                rdesc = f"XXX {rdesc}"
-                self.parsed_rdesc = hidtools.hid.ReportDescriptor.from_string(rdesc)
-            else:
-                self.parsed_rdesc = hidtools.hid.ReportDescriptor.from_bytes(rdesc)
+            self.parsed_rdesc = _parse_rdesc(
+                rdesc if isinstance(rdesc, str) else bytes(rdesc)
+            )
         if self.parsed_rdesc is not None:  # should always be true
             self._rdesc = self.parsed_rdesc.bytes
 
@@ -252,18 +311,22 @@ class UHIDDevice(object):
         return self._info[2]
 
     def _call_set_report(self: "UHIDDevice", req: int, err: int) -> None:
-        buf = struct.pack("< L L H", UHIDDevice._UHID_SET_REPORT_REPLY, req, err)
+        buf = _SET_REPORT_REPLY.pack(UHIDDevice._UHID_SET_REPORT_REPLY, req, err)
         os.write(self._fd, buf)
 
     def _call_get_report(self: "UHIDDevice", req: U8, data: List[U8], err: int) -> None:
-        bdata = bytes(data)
-        buf = struct.pack(
-            "< L L H H 4096s",
+        bdata = data if isinstance(data, (bytes, bytearray)) else bytes(data)
+        buf = self._get_report_buf
+        _GET_REPORT_REPLY.pack_into(
+            buf,
+            0,
             UHIDDevice._UHID_GET_REPORT_REPLY,
             req,
             err,
             len(bdata),
-            bdata,
+        )
+        self._get_report_end = _pack_data(
+            buf, _GET_REPORT_REPLY.size, bdata, self._get_report_end
         )
         os.write(self._fd, buf)
 
@@ -274,9 +337,16 @@ class UHIDDevice(object):
         :param list data: a list of 8-bit integers representing the HID
             report for this input event
         """
-        data: bytes = bytes(_data)
-        buf = struct.pack("< L H 4096s", UHIDDevice._UHID_INPUT2, len(data), data)
-        logger.debug(f"inject {buf[:len(data)]!r}")
+        # no need to copy the data if it is already bytes
+        if isinstance(_data, (bytes, bytearray)):
+            data = _data
+        else:
+            data = bytes(_data)
+        buf = self._input_buf
+        _INPUT2.pack_into(buf, 0, UHIDDevice._UHID_INPUT2, len(data))
+        self._input_end = _pack_data(buf, _INPUT2.size, data, self._input_end)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"inject {bytes(buf[:len(data)])!r}")
         os.write(self._fd, buf)
 
     @property
@@ -320,7 +390,12 @@ class UHIDDevice(object):
         Ensure that :meth:`dispatch` is called and that you wait for some
         reasonable time after creating the device.
         """
-        return [f"/dev/{h.name}" for h in self.walk_sysfs("hidraw")]
+        # a HID device has at most one hidraw node: once found, we only need
+        # to check it is still there (the device may have been rebound)
+        hidraw = self._hidraw_sysfs
+        if not hidraw or not all(h.exists() for h in hidraw):
+            hidraw = self._hidraw_sysfs = self.walk_sysfs("hidraw")
+        return [f"/dev/{h.name}" for h in hidraw]
 
     def create_kernel_device(self: "UHIDDevice") -> None:
         """
@@ -339,11 +414,19 @@ class UHIDDevice(object):
         ):
             raise UHIDIncompleteException("missing uhid initialization")
 
-        with UeventSocket() as kus:
-            kus.bind()
-
-            buf = struct.pack(
-                "< L 128s 64s 64s H H L L L L 4096s",
+        # listen to the kernel uevents (multicast group 1) before creating
+        # the device so we can not miss the one announcing it
+        with socket.socket(
+            socket.AF_NETLINK, socket.SOCK_RAW, _NETLINK_KOBJECT_UEVENT
+        ) as uevents:
+            uevents.bind((0, 1))
+
+            # rd_data is copied in place from the list of ints, the
+            # rest of the bytearray is already zeroed
+            buf = bytearray(_CREATE2.size)
+            _CREATE2.pack_into(
+                buf,
+                0,
                 UHIDDevice._UHID_CREATE2,
                 bytes(self._name, "utf-8"),  # name
                 bytes(self._phys, "utf-8"),  # phys
@@ -354,8 +437,9 @@ class UHIDDevice(object):
                 self.pid,  # product
                 0,  # version
                 0,  # country
-                bytes(self._rdesc),
-            )  # rd_data[HID_MAX_DESCRIPTOR_SIZE]
+                b"",  # rd_data[HID_MAX_DESCRIPTOR_SIZE]
+            )
+            buf[_CREATE2_RD_DATA : _CREATE2_RD_DATA + len(self._rdesc)] = self._rdesc
 
             logger.debug("creating kernel device")
             n = os.write(self._fd, buf)
@@ -365,22 +449,25 @@ class UHIDDevice(object):
             # when we are here, we might still not have the device created
             # and thus need to wait for incoming events. In practice, this
             # works at the first attempt
-            found: Optional[Path] = None
+            poll = select.poll()
+            poll.register(uevents, select.POLLIN)
+            uniq = b"HID_UNIQ=" + bytes(self.uniq, "utf-8")
+            msg = bytearray(8192)
             for _ in range(10):
-                for uevent in kus.get():
-                    if uevent.get("HID_UNIQ", "") == self.uniq:
-                        found = uevent
-                        break
-                if found is not None:
+                if not poll.poll(100):
                     break
-                time.sleep(0.001)
-            if found is not None:
-                self._sys_path = Path("/sys") / uevent["DEVPATH"].lstrip("/")
-                assert (
-                    self._sys_path is not None
-                )  # shut up the linter for .name not found in None
+                n = uevents.recv_into(msg)
+                # a uevent is "action@devpath\0KEY=value\0KEY=value..."
+                if msg.find(uniq, 0, n) < 0:
+                    continue
+                fields = bytes(msg[:n]).split(b"\0")
+                if uniq not in fields:
+                    continue
+                devpath = next(f for f in fields if f.startswith(b"DEVPATH="))
+                self._sys_path = Path("/sys") / devpath[8:].decode().lstrip("/")
                 self.hid_id = int(self._sys_path.name[15:], 16)
                 self._ready = True
+                break
 
     def destroy(self: "UHIDDevice") -> None:
         """
@@ -391,7 +478,7 @@ class UHIDDevice(object):
         """
 
         if self._ready:
-            buf = struct.pack("< L", UHIDDevice._UHID_DESTROY)
+            buf = _EVENT_TYPE.pack(UHIDDevice._UHID_DESTROY)
             os.write(self._fd, buf)
             self._ready = False
             # equivalent to dispatch() but just for our device.
@@ -399,12 +486,12 @@ class UHIDDevice(object):
             poll = select.poll()
             poll.register(self._fd, select.POLLIN)
             while poll.poll(1):
-                fun = self._polling_functions[self._fd]
-                fun()
+                self._process_events()
 
         UHIDDevice._devices.remove(self)
         self._remove_fd_from_poll(self._fd)
         os.close(self._fd)
+        self._hidraw_sysfs = ()
         self._is_destroyed = True
 
     def start(self: "UHIDDevice", flags: int) -> None:
@@ -465,14 +552,15 @@ class UHIDDevice(object):
         return 5  # EIO
 
     def _set_report(
-        self: "UHIDDevice", req: int, rnum: int, rtype: int, size: int, data: List[int]
+        self: "UHIDDevice", req: int, rnum: int, rtype: int, size: int, data: bytes
     ) -> None:
-        logger.debug(
-            "set report {} {} {} {} {} ".format(
-                req, rnum, rtype, size, [f"{d:02x}" for d in data[:size]]
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "set report {} {} {} {} {} ".format(
+                    req, rnum, rtype, size, bytes(data[:size]).hex(" ")
+                )
             )
-        )
-        error = self.set_report(req, rnum, rtype, [int(x) for x in data[:size]])
+        error = self.set_report(req, rnum, rtype, list(data[:size]))
         if self._ready:
             self._call_set_report(req, error)
 
@@ -495,14 +583,13 @@ class UHIDDevice(object):
         return (5, [])  # EIO
 
     def _get_report(self: "UHIDDevice", req: int, rnum: int, rtype: int) -> None:
-        logger.debug("get report {} {} {}".format(req, rnum, rtype))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("get report {} {} {}".format(req, rnum, rtype))
         error, data = self.get_report(req, rnum, rtype)
         if self._ready:
             self._call_get_report(req, data, error)
 
-    def output_report(
-        self: "UHIDDevice", data: List[int], size: int, rtype: int
-    ) -> None:
+    def output_report(self: "UHIDDevice", data: bytes, size: int, rtype: int) -> None:
         """
         Callback invoked when a process sends raw data to the device.
 
@@ -510,34 +597,64 @@ class UHIDDevice(object):
         :param size: size of the data
         :param rtype: one of :attr:`UHID_FEATURE_REPORT`, :attr:`UHID_INPUT_REPORT`, or :attr:`UHID_OUTPUT_REPORT`
         """
-        logger.debug(
-            "output {} {} {}".format(rtype, size, [f"{d:02x}" for d in data[:size]])
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "output {} {} {}".format(rtype, size, bytes(data[:size]).hex(" "))
+            )
 
-    def _process_one_event(self: "UHIDDevice") -> None:
-        buf = os.read(self._fd, 4380)
+    def _uhid_start(self: "UHIDDevice", buf: bytes) -> None:
+        ev, flags = _START.unpack_from(buf)
+        self.start(flags)
+
+    def _uhid_open(self: "UHIDDevice", buf: bytes) -> None:
+        self.open()
+
+    def _uhid_stop(self: "UHIDDevice", buf: bytes) -> None:
+        self.stop()
+
+    def _uhid_close(self: "UHIDDevice", buf: bytes) -> None:
+        self.close()
+
+    def _uhid_set_report(self: "UHIDDevice", buf: bytes) -> None:
+        ev, req, rnum, rtype, size = _SET_REPORT.unpack_from(buf)
+        data = buf[_SET_REPORT.size : _SET_REPORT.size + size]
+        self._set_report(req, rnum, rtype, size, data)
+
+    def _uhid_get_report(self: "UHIDDevice", buf: bytes) -> None:
+        ev, req, rnum, rtype = _GET_REPORT.unpack_from(buf)
+        self._get_report(req, rnum, rtype)
+
+    def _uhid_output(self: "UHIDDevice", buf: bytes) -> None:
+        size, rtype = _OUTPUT.unpack_from(buf)
+        data = buf[4 : 4 + size]
+        self.output_report(data, size, rtype)
+
+    # the handler of each uhid event type we care about
+    _event_handlers: Final[Dict[int, Callable[["UHIDDevice", bytes], None]]] = {
+        _UHID_START: _uhid_start,
+        _UHID_OPEN: _uhid_open,
+        _UHID_STOP: _uhid_stop,
+        _UHID_CLOSE: _uhid_close,
+        _UHID_SET_REPORT: _uhid_set_report,
+        _UHID_GET_REPORT: _uhid_get_report,
+        _UHID_OUTPUT: _uhid_output,
+    }
+
+    def _process_events(self: "UHIDDevice") -> None:
+        # drain all pending events, the fd is non-blocking
+        while True:
+            try:
+                buf = os.read(self._fd, 4380)
+            except BlockingIOError:
+                return
+            self._process_one_event(buf)
+
+    def _process_one_event(self: "UHIDDevice", buf: bytes) -> None:
         assert (len(buf) == 4380) or (len(buf) == 4376)
-        evtype = struct.unpack_from("< L", buf)[0]
-        if evtype == UHIDDevice._UHID_START:
-            ev, flags = struct.unpack_from("< L Q", buf)
-            self.start(flags)
-        elif evtype == UHIDDevice._UHID_OPEN:
-            self._open()
-        elif evtype == UHIDDevice._UHID_STOP:
-            self._stop()
-        elif evtype == UHIDDevice._UHID_CLOSE:
-            self._close()
-        elif evtype == UHIDDevice._UHID_SET_REPORT:
-            ev, req, rnum, rtype, size, data = struct.unpack_from(
-                "< L L B B H 4096s", buf
-            )
-            self._set_report(req, rnum, rtype, size, data)
-        elif evtype == UHIDDevice._UHID_GET_REPORT:
-            ev, req, rnum, rtype = struct.unpack_from("< L L B B", buf)
-            self._get_report(req, rnum, rtype)
-        elif evtype == UHIDDevice._UHID_OUTPUT:
-            ev, data, size, rtype = struct.unpack_from("< L 4096s H B", buf)
-            self._output_report(data, size, rtype)
+        evtype = _EVENT_TYPE.unpack_from(buf)[0]
+        handler = UHIDDevice._event_handlers.get(evtype)
+        if handler is not None:
+            handler(self, buf)
 
     def create_report(
         self: "UHIDDevice",
@@ -20,50 +20,79 @@
 from tests_kernel.base import UHIDTestDevice
 from hidtools.cli.decode import main as decode
 from click.testing import CliRunner
+import functools
 import logging
 import pytest
 import re
+import time
 
-from typing import List
+from typing import List, Tuple, Union
 
 logger = logging.getLogger("hidtools.test.cli.decode")
 
+# every line of the dump: End Collection, Push and Pop are single byte
+# items, all others have at least two bytes
+LINE_RE = re.compile(
+    "(?P<end_collection>0xc0, *// +End Collection *[0-9]+\n)"
+    "|(?P<push>0xa4, *// +Push *[0-9]+\n)"
+    "|(?P<pop>0xb4, *// +Pop *[0-9]+\n)"
+    "|(?P<item>(0x[0-9a-f][0-9a-f], )+0x[0-9a-f][0-9a-f], *// .*)"
+)
+# the LINE_RE group a line must match, from the item name in its comment
+LINE_RE_GROUPS = {"End Collection": "end_collection", "Push": "push", "Pop": "pop"}
+# the item bytes, the comments may have hex numbers too, e.g.
+# "Usage (Vendor Usage 0x01)", but never followed by a comma
+BYTE_RE = re.compile("0x([0-9a-f][0-9a-f]),")
+
+
+@functools.lru_cache(maxsize=64)
+def _run_hid_decode(
+    cli_args: Tuple[str, ...], data: Union[str, bytes]
+) -> Tuple[str, ...]:
+    # every test of a class decodes the same data, only do it once. The
+    # text data is the cache key as is, so it is only encoded here
+    if isinstance(data, str):
+        data = bytes(data, encoding="utf-8")
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open("report-descriptor.hid", "wb") as sourcefile:
+            sourcefile.write(data)
+
+        # the output is captured by the runner, no need for a file
+        result = runner.invoke(
+            decode, list(cli_args) + ["--output", "-", sourcefile.name]
+        )
+        assert result.exception is None, result.exception
+        return tuple(result.stdout.splitlines(keepends=True))
+
 
 class BaseTest:
     class HidDecodeBase(object):
         cli_args: List[str] = []
 
         def run_hid_decode(self):
-            runner = CliRunner()
-            with runner.isolated_filesystem():
-                with open("report-descriptor.hid", "wb") as sourcefile:
-                    if isinstance(self.data, str):
-                        data = bytes(self.data, encoding="utf-8")
-                    else:
-                        data = self.data
-                    sourcefile.write(data)
-                    sourcefile.seek(0)
-
-                runner.invoke(
-                    decode, self.cli_args + ["--output", "output.txt", sourcefile.name]
-                )
-                with open("output.txt") as outfile:
-                    return outfile.readlines()
+            data = (
+                self.data if isinstance(self.data, (str, bytes)) else bytes(self.data)
+            )
+            return list(_run_hid_decode(tuple(self.cli_args), data))
 
         def get_rdesc_dump(self, output):
-            _output = [o.lstrip("# ") for o in output if o.startswith("# ")]
-            return [o for o in _output if o.strip() and "device " not in o]
-
-        @property
+            return [
+                o
+                for line in output
+                if line.startswith("# ")
+                and (o := line.lstrip("# ")).strip()
+                and "device " not in o
+            ]
+
+        @functools.cached_property
         def output(self):
-            if not hasattr(self, "_output"):
-                self._output = self.get_rdesc_dump(self.run_hid_decode())
-            return self._output
+            return self.get_rdesc_dump(self.run_hid_decode())
 
         def output_to_bytes(self, output_lines):
             """Convert the hid-decode output into a list of bytes"""
-            items = ", ".join(output_lines).split(", ")
-            return [int(b, 16) for b in items if b.startswith("0x")]
+            hexbytes = "".join(BYTE_RE.findall("".join(output_lines)))
+            return list(bytes.fromhex(hexbytes))
 
         def test_read(self):
             assert self.output is not None
@@ -77,18 +106,12 @@ class BaseTest:
 
         def test_format(self):
             for line in self.output:
-                if "End Collection" in line:
-                    assert re.search("0xc0, *// +End Collection *[0-9]+\n", line)
-                elif "Push" in line:
-                    assert re.search("0xa4, *// +Push *[0-9]+\n", line)
-                elif "Pop" in line:
-                    assert re.search("0xb4, *// +Pop *[0-9]+\n", line)
-                elif line == "**** win 8 certified ****\n":
-                    pass
-                else:
-                    assert re.search(
-                        "0x[0-9a-f][0-9a-f], 0x[0-9a-f][0-9a-f], *// .*", line
-                    )
+                if line != "**** win 8 certified ****\n":
+                    m = LINE_RE.match(line)
+                    assert m, line
+                    # drop the offset at the end of the comment
+                    name = line.partition("//")[2].rsplit(maxsplit=1)[0].strip()
+                    assert m.lastgroup == LINE_RE_GROUPS.get(name, "item"), line
 
 
 class TestHidRecording(BaseTest.HidDecodeBase):
@@ -111,7 +134,7 @@ I: 3 046d c24e
         assert "End Collection" in self.output[-2]
 
         bytelist = self.output_to_bytes(self.output)
-        strbytes = " ".join(f"{x:02x}" for x in bytelist)
+        strbytes = bytes(bytelist).hex(" ")
         expected = f"R: {len(bytelist)} {strbytes}"
         assert self.data.split("\n")[1] == expected
 
@@ -239,8 +262,15 @@ class TestHidrawSysfsReportDescriptor(BaseTest.HidDecodeBase):
         except PermissionError:
             pytest.skip("Insufficient permissions, run me as root")
         self.uhid_device.create_kernel_device()
-        while not self.uhid_device.device_nodes:
-            self.uhid_device.dispatch(10)
+        # dispatch() only returns once the poll set is idle for the timeout,
+        # so keep it short and check for both nodes after each round
+        now = time.time()
+        while (
+            not self.uhid_device.device_nodes or not self.uhid_device.hidraw_nodes
+        ) and time.time() - now < 5:
+            self.uhid_device.dispatch(1)
+        if not self.uhid_device.device_nodes or not self.uhid_device.hidraw_nodes:
+            pytest.fail("the uhid device did not show up in time")
 
         node = self.uhid_device.device_nodes[0]
         assert node.startswith("/dev/input/")
@@ -17,7 +17,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-from hidtools.hut import HUT
+import hidtools.hut
+from hidtools.hut import HUT, HidUsageTable
 
 import logging
 import pytest
@@ -69,6 +70,68 @@ class TestHUT(object):
     def test_hut_exists(self):
         assert HUT is not None
 
+    def test_hut_cache(self, tmp_path, monkeypatch):
+        cache_file = tmp_path / "hid-tools" / "hut.json"
+        monkeypatch.setattr(hidtools.hut, "CACHE_FILE", str(cache_file))
+
+        parsed = HidUsageTable._from_hut_data()
+        assert cache_file.exists()
+        cached = HidUsageTable._from_hut_data()
+        assert cached is not parsed
+
+        assert list(cached) == list(parsed)
+        for page_id, page in parsed.items():
+            assert cached[page_id].page_id == page.page_id
+            assert cached[page_id].page_name == page.page_name
+            assert {u: v.name for u, v in cached[page_id].items()} == {
+                u: v.name for u, v in page.items()
+            }
+
+        # a broken cache file is ignored
+        cache_file.write_text('{"key": [], "pages": 1}')
+        assert HidUsageTable._from_cache(HidUsageTable._hut_data_key()) is None
+        cache_file.write_text("not json")
+        assert len(HidUsageTable._from_hut_data()) == len(parsed)
+
+    def test_hut_lazy_pages(self, tmp_path, monkeypatch):
+        # a cache file that can not be written
+        (tmp_path / "file").touch()
+        monkeypatch.setattr(hidtools.hut, "CACHE_FILE", str(tmp_path / "file" / "x"))
+        parsed = HidUsageTable._from_hut_data()
+
+        monkeypatch.setattr(hidtools.hut, "CACHE_FILE", str(tmp_path / "hut.json"))
+        HidUsageTable._from_hut_data()
+        cached = HidUsageTable._from_hut_data()
+
+        for hut in (parsed, cached):
+            pages = hut.usage_pages.values()
+            assert all(hasattr(p, "_usages_loader") for p in pages)
+            assert hut[0x01].page_name == "Generic Desktop"
+            assert hut[0x01][0x30] == "X"
+            assert hut[0x01][0x30].usage_page is hut[0x01]
+            loaded = [p for p in pages if not hasattr(p, "_usages_loader")]
+            assert loaded == [hut[0x01]]
+
+    def test_hut_lazy_page_load_error(self):
+        page = hidtools.hut.HidUsagePage()
+        page.page_id = 0x01
+        page.page_name = "Generic Desktop"
+        calls = []
+
+        def load(usage_page):
+            calls.append(usage_page)
+            if len(calls) == 1:
+                raise OSError("unreadable")
+            usage_page[0x30] = hidtools.hut.HidUsage(usage_page, 0x30, "X")
+
+        page._set_usages_loader(load)
+        with pytest.raises(OSError):
+            page[0x30]
+        assert hasattr(page, "_usages_loader")
+        assert page[0x30] == "X"
+        assert page["X"] == page[0x30]
+        assert len(calls) == 2
+
     def test_hut_size(self):
         # Update this test when a new Usage Page is added
         assert len(HUT) == 37
@@ -203,7 +203,7 @@ class BaseTest:
 
 class SaitekGamepad(JoystickGamepad):
     # fmt: off
-    report_descriptor = [
+    report_descriptor = bytes([
         0x05, 0x01,                    # Usage Page (Generic Desktop)        0
         0x09, 0x04,                    # Usage (Joystick)                    2
         0xa1, 0x01,                    # Collection (Application)            4
@@ -504,7 +504,7 @@ class SaitekGamepad(JoystickGamepad):
         0x91, 0x02,                    # ..Output (Data,Var,Abs)             621
         0xc0,                          # .End Collection                     623
         0xc0,                          # End Collection                      624
-    ]
+    ])
     # fmt: on
 
     def __init__(self, rdesc=report_descriptor, name=None):
@@ -514,7 +514,7 @@ class SaitekGamepad(JoystickGamepad):
 
 class AsusGamepad(BaseGamepad):
     # fmt: off
-    report_descriptor = [
+    report_descriptor = bytes([
         0x05, 0x01,                    # Usage Page (Generic Desktop)        0
         0x09, 0x05,                    # Usage (Game Pad)                    2
         0xa1, 0x01,                    # Collection (Application)            4
@@ -602,7 +602,7 @@ class AsusGamepad(BaseGamepad):
         0x81, 0x02,                    # ..Input (Data,Var,Abs)              189
         0xc0,                          # .End Collection                     191
         0xc0,                          # End Collection                      192
-    ]
+    ])
     # fmt: on
 
     def __init__(self, rdesc=report_descriptor, name=None):